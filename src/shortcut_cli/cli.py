@@ -4,6 +4,7 @@
 """
 
 import argparse
+import concurrent.futures
 import functools
 import logging
 
@@ -14,6 +15,7 @@ from yaml import safe_load
 from . import __version__
 from .importer import Importer
 from .shortcut import Shortcut
+from .snapshot import Snapshot
 
 
 _logger = logging.getLogger(__name__)
@@ -62,7 +64,7 @@ def _create_arg_parser() -> argparse.ArgumentParser:
     ap.set_defaults(func=create_iterations)
     ap.add_argument("--duration", "-d", default=10, type=int, help="duration of iteration")
     ap.add_argument("--n-iterations", "-n", default=1, type=int, help="number of iterations to create")
-    ap.add_argument("--period", "-p", default=14, help="start every n days")
+    ap.add_argument("--period", "-p", default=14, type=int, help="start every n days")
     ap.add_argument(
         "--start-date",
         "-s",
@@ -71,6 +73,7 @@ def _create_arg_parser() -> argparse.ArgumentParser:
         help="iteration start date",
     )
     ap.add_argument("--team-slug", "-t", required=True, help="Team slug (not name)")
+    ap.add_argument("--workers", default=4, type=int, help="number of concurrent create requests")
 
     # connect-zenhub-epics
     ap = subparsers.add_parser("connect-zenhub-epics", help="Connect issues that have already been migrated")
@@ -94,8 +97,25 @@ def _create_arg_parser() -> argparse.ArgumentParser:
     ap.add_argument("repos", nargs=1, help="Repo name")
 
     # shell
-    ap = subparsers.add_parser("shell", help="Open IPython shell with shortcut initialized")
+    ap = subparsers.add_parser("shell", help="Open IPython shell with shortcut (sc) and snapshot (snap) initialized")
     ap.set_defaults(func=shell)
+    ap.add_argument(
+        "--offline",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+        help="do not connect to Shortcut; use only the local snapshot",
+    )
+
+    # snapshot
+    ap = subparsers.add_parser("snapshot", help="Save or refresh a local snapshot of the workspace")
+    ap.set_defaults(func=snapshot)
+    ap.add_argument(
+        "--full",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+        help="fetch everything instead of changes since the last refresh; also removes deleted stories",
+    )
+    ap.add_argument("--workers", default=4, type=int, help="number of concurrent story requests")
 
     # unarchive-epics
     ap = subparsers.add_parser("unarchive-epics", help="Unarchive specified epics")
@@ -169,15 +189,46 @@ def archive_epics(opts):
 def create_iterations(opts):
     config = opts._config
     shortcut_token = config["shortcut"]["tokens"][config["shortcut"]["workspace"]]
-    sc = Shortcut(token=shortcut_token)
     assert opts.period > opts.duration > 0, "period must be greater than duration, both > 0"
-    it_start_date = opts.start_date
+    assert opts.workers >= 1, "workers must be at least 1"
+    sc = Shortcut(token=shortcut_token)
+    # ISO 8601 dates compare correctly as strings
+    existing = [(it["start_date"], it["end_date"]) for it in sc.get_iterations(team_slug=opts.team_slug)]
+    windows = []
     for i in range(opts.n_iterations):
-        resp = sc.create_iteration(
-            start_date=it_start_date, end_date=it_start_date.add(days=opts.duration), team_slug=opts.team_slug
+        it_start_date = opts.start_date.add(days=i * opts.period)
+        it_end_date = it_start_date.add(days=opts.duration)
+        start, end = it_start_date.isoformat(), it_end_date.isoformat()
+        # skip any window that overlaps an existing iteration, even if its dates were edited
+        if not any(ex_start <= end and start <= ex_end for ex_start, ex_end in existing):
+            windows.append((it_start_date, it_end_date))
+    _logger.info(
+        f"{opts.n_iterations - len(windows)} of {opts.n_iterations} iterations overlap existing ones;"
+        f" creating {len(windows)}"
+    )
+    if opts.dry_run:
+        _logger.info("(dry-run specified... not really creating)")
+        return
+    # API calls are throttled by APIClient's rate limiter, which is shared across threads
+    with concurrent.futures.ThreadPoolExecutor(max_workers=opts.workers) as executor:
+        futures = {
+            executor.submit(sc.create_iteration, start_date=s, end_date=e, team_slug=opts.team_slug): (s, e)
+            for s, e in windows
+        }
+        n_failed = 0
+        for future in concurrent.futures.as_completed(futures):
+            start_date, end_date = futures[future]
+            try:
+                resp = future.result()
+            except Exception as e:
+                n_failed += 1
+                _logger.error(f"Failed to create iteration {start_date} — {end_date}: {e}")
+                continue
+            _logger.info(f"Created iteration {resp['name']} ({resp['app_url']})")
+    if n_failed:
+        raise RuntimeError(
+            f"{n_failed} of {len(windows)} iterations were not created; rerun to create only the missing ones"
         )
-        _logger.info(f"Created iteration {resp['name']} ({resp['app_url']})")
-        it_start_date = it_start_date.add(days=opts.period)
 
 
 def import_github_issues(opts):
@@ -197,13 +248,28 @@ def connect_zenhub_epics(opts):
 
 def shell(opts):
     config = opts._config
-    shortcut_token = config["shortcut"]["tokens"][config["shortcut"]["workspace"]]
-    sc = Shortcut(token=shortcut_token)
+    snap = Snapshot.from_config(config)
+    if opts.offline and not snap.exists():
+        raise RuntimeError(f"no snapshot in {snap.directory}; run the snapshot command first")
+    if not opts.offline:
+        shortcut_token = config["shortcut"]["tokens"][config["shortcut"]["workspace"]]
+        sc = Shortcut(token=shortcut_token)
+    if snap.exists():
+        _logger.info(f"Snapshot (refreshed at {snap.metadata['refreshed_at']}) is available as `snap`")
     import IPython
 
     IPython.embed()
 
 
+def snapshot(opts):
+    config = opts._config
+    shortcut_token = config["shortcut"]["tokens"][config["shortcut"]["workspace"]]
+    assert opts.workers >= 1, "workers must be at least 1"
+    sc = Shortcut(token=shortcut_token)
+    snap = Snapshot.from_config(config)
+    snap.refresh(sc, full=opts.full, workers=opts.workers)
+
+
 def unarchive_epics(opts):
     config = opts._config
     shortcut_token = config["shortcut"]["tokens"][config["shortcut"]["workspace"]]
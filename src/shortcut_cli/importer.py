@@ -11,6 +11,7 @@ import requests.exceptions
 from zenhub import Zenhub
 
 from .shortcut import Shortcut
+from .snapshot import Snapshot
 
 _logger = logging.getLogger(__name__)
 
@@ -31,6 +32,9 @@ class Importer:
         self._shortcut = Shortcut(token=shortcut_token)
         migrated_fn = "{}-{}".format(config["migrated_filename"], config["shortcut"]["workspace"])
         self.migrated = shelve.open(migrated_fn)
+        self.snapshot = Snapshot.from_config(config)
+        if self.snapshot.exists():
+            _logger.info(f"Using snapshot refreshed at {self.snapshot.metadata['refreshed_at']} to find migrated issues")
         self.strict = True
         self.allow_duplicates = False
 
@@ -81,7 +85,10 @@ class Importer:
         is_epic = any(l for l in issue.labels if l.name == "Epic")
         original_comment = f"Migrated from GitHub [{self.github_org}/{repo_name}#{issue.number}]({issue.html_url})"
 
-        el_stories = self._shortcut._story_find_by_external_link(issue.html_url)
+        # the snapshot avoids an API call per issue; stories created since the last refresh are found via the API
+        el_stories = self.snapshot.find_stories_by_external_link(issue.html_url) if self.snapshot.exists() else []
+        if not el_stories:
+            el_stories = self._shortcut._story_find_by_external_link(issue.html_url)
         if el_stories:
             story = el_stories[0]
             _logger.info("[link] Skipping %s; already migrated to %s" % (issue.html_url, story["app_url"]))
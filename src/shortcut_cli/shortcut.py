@@ -200,6 +200,18 @@ class Shortcut(APIClient):
 
     def get_epics(self):
         return self.get("epics")
+
+    def get_iterations(self, team_slug=None):
+        """return iterations, optionally restricted to those assigned to team_slug"""
+        iterations = self.get("iterations")
+        if team_slug:
+            team_id = self.teams_map[team_slug]["id"]
+            iterations = [it for it in iterations if team_id in it["group_ids"]]
+        return iterations
+
+    def search_stories(self, updated_at_start: str = None, **kwargs):
+        """return stories matching search criteria, e.g., those updated since updated_at_start (ISO 8601)"""
+        return self.post("stories/search", dict(updated_at_start=updated_at_start, **kwargs))
         
     def _story_find_by_external_link(self, external_link: str):
         return self.get(path="external-link/stories", data={"external_link": external_link})
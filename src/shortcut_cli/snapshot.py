@@ -0,0 +1,215 @@
+"""Offline snapshot of a Shortcut workspace
+
+A snapshot is a directory of gzipped JSON Lines files, one per entity type
+(epics, stories, epic and story comments, members, custom fields), plus an
+index of story external links and a small metadata file that records when
+the snapshot was last refreshed.  Refreshes are incremental: only stories
+updated since the previous refresh are fetched, and only comments of updated
+epics and stories are re-fetched.
+
+Epics are listed in full on every refresh, so deleted epics are removed.
+Stories are only added or updated incrementally; a deleted story remains in
+the snapshot until the next full refresh.
+
+"""
+
+import concurrent.futures
+import datetime
+import gzip
+import json
+import logging
+import os
+import re
+
+_logger = logging.getLogger(__name__)
+
+github_repo_re = re.compile(r"^https?://(?:www\.)?github\.com/([^/]+/[^/#?]+)", re.IGNORECASE)
+
+
+class Snapshot:
+    """Local, queryable copy of a Shortcut workspace"""
+
+    entities = ("epics", "stories", "epic_comments", "story_comments", "members", "custom_fields")
+
+    # comments are keyed by parent and comment id so that ids can never collide across parents
+    parent_id_keys = {"epic_comments": "epic_id", "story_comments": "story_id"}
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): directory in which snapshot files are stored
+        """
+        self.directory = directory
+        self._cache = {}
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """return the snapshot for the configured workspace"""
+        dirname = "{}-{}".format(config.get("snapshot_dirname", "snapshot"), config["shortcut"]["workspace"])
+        return cls(dirname)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _key(self, entity: str, record: dict):
+        if entity in self.parent_id_keys:
+            return (record[self.parent_id_keys[entity]], record["id"])
+        return record["id"]
+
+    def _load(self, entity: str) -> dict:
+        """return {id: record} for entity, or {} if it has not been snapshotted"""
+        if entity not in self._cache:
+            records = {}
+            path = self._path(f"{entity}.jsonl.gz")
+            if os.path.exists(path):
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        record = json.loads(line)
+                        records[self._key(entity, record)] = record
+            self._cache[entity] = records
+        return self._cache[entity]
+
+    def _save(self, entity: str, records: dict):
+        path = self._path(f"{entity}.jsonl.gz")
+        with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+            for record in records.values():
+                f.write(json.dumps(record) + "\n")
+        os.replace(path + ".tmp", path)
+        self._cache[entity] = records
+
+    def _save_json(self, name: str, data):
+        path = self._path(name)
+        with open(path + ".tmp", "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    @property
+    def metadata(self) -> dict:
+        path = self._path("metadata.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def exists(self) -> bool:
+        return "refreshed_at" in self.metadata
+
+    def refresh(self, sc, full: bool = False, workers: int = 4):
+        """update snapshot from Shortcut
+
+        Args:
+            sc (Shortcut): Shortcut client
+            full (bool): ignore previous refresh and fetch everything
+            workers (int): number of concurrent story requests
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        since = None if full else self.metadata.get("refreshed_at")
+        refreshed_at = datetime.datetime.utcnow().strftime("%FT%TZ")
+        _logger.info(f"Refreshing snapshot in {self.directory} " + (f"(changes since {since})" if since else "(full)"))
+
+        # members and custom fields are small; always replace them
+        self._save("members", {m["id"]: m for m in sc.get("members")})
+        self._save("custom_fields", {cf["id"]: cf for cf in sc.get("custom-fields")})
+
+        # epics are always listed in full, which also drops deleted epics
+        epics = {e["id"]: e for e in sc.get_epics()}
+        updated_epics = [e for e in epics.values() if since is None or e["updated_at"] >= since]
+        updated_epic_ids = {e["id"] for e in updated_epics}
+        epic_comments = {} if full else self._load("epic_comments")
+        epic_comments = {
+            k: c for k, c in epic_comments.items() if c["epic_id"] in epics and c["epic_id"] not in updated_epic_ids
+        }
+        for epic in updated_epics:
+            for comment in sc.get(f"epics/{epic['id']}/comments"):
+                comment = dict(comment, epic_id=epic["id"])
+                epic_comments[self._key("epic_comments", comment)] = comment
+
+        # search returns slim stories; fetch full stories (with comments) concurrently
+        # API calls are throttled by APIClient's rate limiter, which is shared across threads
+        stories = {} if full else self._load("stories")
+        updated_story_ids = [st["id"] for st in sc.search_stories(updated_at_start=since)]
+        story_comments = {} if full else self._load("story_comments")
+        updated_story_id_set = set(updated_story_ids)
+        story_comments = {k: c for k, c in story_comments.items() if c["story_id"] not in updated_story_id_set}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for story in executor.map(lambda sid: sc.get(f"stories/{sid}"), updated_story_ids):
+                comments = story.pop("comments", [])
+                stories[story["id"]] = story
+                for comment in comments:
+                    comment = dict(comment, story_id=story["id"])
+                    story_comments[self._key("story_comments", comment)] = comment
+
+        self._save("epics", epics)
+        self._save("epic_comments", epic_comments)
+        self._save("stories", stories)
+        self._save("story_comments", story_comments)
+        self._save_json("external_links.json", self._build_external_link_index(stories))
+        self._cache.pop("external_links", None)
+        self._save_json("metadata.json", {"refreshed_at": refreshed_at, "previous_refreshed_at": since})
+        _logger.info(
+            f"Snapshot refreshed: {len(updated_epics)} epics and {len(updated_story_ids)} stories updated;"
+            f" {len(epics)} epics, {len(stories)} stories,"
+            f" {len(epic_comments) + len(story_comments)} comments total"
+        )
+
+    @staticmethod
+    def _build_external_link_index(stories: dict) -> dict:
+        """return {"urls": {external_link: [story_id, ...]}, "github_repos": {"org/repo": [story_id, ...]}}
+
+        GitHub repo keys are lowercased because GitHub names are case-insensitive.
+        """
+        urls, github_repos = {}, {}
+        for story in stories.values():
+            for link in story.get("external_links", []):
+                urls.setdefault(link, []).append(story["id"])
+                m = github_repo_re.match(link)
+                if m:
+                    repo_ids = github_repos.setdefault(m.group(1).lower(), [])
+                    if story["id"] not in repo_ids:
+                        repo_ids.append(story["id"])
+        return {"urls": urls, "github_repos": github_repos}
+
+    @property
+    def external_link_index(self) -> dict:
+        if "external_links" not in self._cache:
+            path = self._path("external_links.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    self._cache["external_links"] = json.load(f)
+            else:
+                self._cache["external_links"] = {}
+        return self._cache["external_links"]
+
+    def epics(self) -> list:
+        return list(self._load("epics").values())
+
+    def stories(self) -> list:
+        return list(self._load("stories").values())
+
+    def epic_comments(self) -> list:
+        return list(self._load("epic_comments").values())
+
+    def story_comments(self) -> list:
+        return list(self._load("story_comments").values())
+
+    def members(self) -> list:
+        return list(self._load("members").values())
+
+    def custom_fields(self) -> list:
+        return list(self._load("custom_fields").values())
+
+    def _stories_by_id(self, story_ids: list) -> list:
+        stories = self._load("stories")
+        return [stories[sid] for sid in sorted(story_ids) if sid in stories]
+
+    def find_stories_by_external_link(self, external_link: str) -> list:
+        """return stories with the given external link"""
+        return self._stories_by_id(self.external_link_index.get("urls", {}).get(external_link, []))
+
+    def find_stories_by_github_repo(self, repo: str) -> list:
+        """return stories linked to issues or PRs in a GitHub repo, given as org/repo"""
+        return self._stories_by_id(self.external_link_index.get("github_repos", {}).get(repo.lower(), []))
+
+    def github_repos(self) -> dict:
+        """return {"org/repo": number of linked stories}"""
+        return {repo: len(sids) for repo, sids in self.external_link_index.get("github_repos", {}).items()}